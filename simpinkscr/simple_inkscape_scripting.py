@@ -169,6 +169,16 @@ def _svg_str_to_python(s):
     return s
 
 
+def _compile_user_code(code):
+    'Compile a user script to a code object.'
+    # Remove an unnecessary import that may be introduced when
+    # running from Visual Studio Code.
+    pattern = r"^[ \t]*(import\s+(inkex|simpinkscr).*|" \
+        r"(from\s+(inkex|simpinkscr)\s+import).*)[\r\n]"
+    code = re.sub(pattern, "", code, flags=re.MULTILINE)
+    return compile(code, '<string>', 'exec')
+
+
 def _read_image_as_base64(fname):
     "Return image data in base64 encoding and the image's MIME type."
     try:
@@ -3766,15 +3776,9 @@ from inkex.paths import curve, horz, move, quadratic, smooth, \
         if self.options.program is not None:
             code += self.options.program.replace(r'\n', '\n')
 
-        # Remove an unnecessary import that may be introduced when
-        # running from Visual Studio Code.
-        pattern = r"^[ \t]*(import\s+(inkex|simpinkscr).*|" \
-            r"(from\s+(inkex|simpinkscr)\s+import).*)[\r\n]"
-        code = re.sub(pattern, "", code, flags=re.MULTILINE)
-
         # Launch the user's script.
         try:
-            exec(code, _user_globals)
+            exec(_compile_user_code(code), _user_globals)
         except SystemExit:
             pass
         _simple_top.replace_all_guides(_user_globals['guides'])
@@ -20,34 +20,159 @@ Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
 
 '''
 
+import functools
 import inkex
-from inkex.localization import inkex_gettext as _
 import math
 import pprint
 import re
+import sys
+
+# The following characters are not allowed in Python variable names.
+_no_var_re = re.compile(r'\W')
+
+# Match a single integer or number in SVG syntax.
+_int_re = re.compile(r'[-+]?\d+')
+_num_re = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+# Fully qualified tags of SVG elements we look for within a subtree.
+_SVG_NS = '{http://www.w3.org/2000/svg}'
+_TSPAN = _SVG_NS + 'tspan'
+_TEXTPATH = _SVG_NS + 'textPath'
+
+# Match an object reference of the form "url(#...)".
+_url_ref_re = re.compile(r'''url\(\s*['"]?#([^)'"\s]+)''')
+
+# Fully qualified tags of elements whose children are referenced by the
+# Python code generated for the element itself.
+_CONTAINER_TAGS = frozenset([_SVG_NS + t
+                             for t in ['g', 'a', 'clipPath', 'mask',
+                                       'marker']])
+
+# Fully qualified tags of definitions that are skipped when nothing
+# refers to them.
+_DEFINITION_TAGS = tuple([_SVG_NS + t
+                          for t in ['clipPath', 'mask', 'marker',
+                                    'linearGradient', 'radialGradient']] +
+                         [inkex.addNS('path-effect', 'inkscape')])
+
+# Fully qualified XLink attribute names.
+_XLINK_NS = '{http://www.w3.org/1999/xlink}'
+_XLINK_HREF = _XLINK_NS + 'href'
+_XLINK_TITLE = _XLINK_NS + 'title'
+
+
+@functools.lru_cache(maxsize=None)
+def _id2var(obj_id, _sub=_no_var_re.sub):
+    '''Return an Inkscape object's ID as a Python variable name.  Results
+    are cached without bound because the same ID is typically referenced
+    many times and interned because they serve as keys for dependency
+    lookups.'''
+    var = _sub(r'_', obj_id)
+    if var[:1].isdigit():
+        var = '_' + var
+    return sys.intern(var)
+
+
+def _parse_nums(s):
+    'Return a list of all numbers appearing in an SVG attribute string.'
+    return list(map(float, _num_re.findall(s)))
+
+
+# Common SVG attribute strings and their Python equivalents.
+_LITERALS = {'true': True, 'false': False, '0': 0, '1': 1, '': repr('')}
+
+# Map list separators in SVG attribute strings to spaces.
+_list_sep_to_space = str.maketrans(',;', '  ')
+
+
+@functools.lru_cache(maxsize=4096)
+def _svg_str_to_python(s):
+    '''Convert an SVG attribute string to an appropriate Python type.
+    Results are cached because attribute values repeat heavily.'''
+    # Quickly handle the most common values.
+    try:
+        return _LITERALS[s]
+    except KeyError:
+        pass
+
+    # Recursively convert lists.
+    fields = s.translate(_list_sep_to_space).split()
+    if len(fields) > 1:
+        return [_svg_str_to_python(f) for f in fields]
+
+    # Specially handle numbers then fall back to strings.
+    num = fields[0] if fields else s
+    if _int_re.fullmatch(num):
+        return int(num)
+    if _num_re.fullmatch(num):
+        return float(num)
+    return repr(s)
 
 
 class SvgToPythonScript(inkex.OutputExtension):
     'Save an Inkscape image to a Simple Inkscape Scripting script.'
 
-    # Most SVG shapes use this as their default style.
+    # Most SVG shapes use this as their default style.  Values are stored
+    # already repr'd because they are copied directly into generated code.
     _common_svg_defaults = {'stroke': repr('none'),
                             'fill': repr('black')}
 
     # Most Simple Inkscape Scripting shapes use this as their default style.
     _common_sis_defaults = {'stroke': '#000000',  # More common than "black"
                             'fill': 'none'}
+    _common_sis_defaults_repr = {k: repr(v)
+                                 for k, v in _common_sis_defaults.items()}
 
     # SVG uses both spaces and commas to separate numbers.
     sep_re = re.compile(r'[\s,]+')
 
+    # Match a pair of numbers, as in an SVG points list.
+    _pt_pair_re = re.compile(r'(%s)[\s,]+(%s)' %
+                             (_num_re.pattern, _num_re.pattern))
+
+    # Map a path's sodipodi:type to the method that converts it.
+    _path_dispatch = {'arc': 'convert_arc', 'star': 'convert_poly_star'}
+
+    def __init__(self):
+        super().__init__()
+        self._path_effect_keys = {}  # Sorted path-effect keys by key set
+        self.var2stmt = {}  # Map from a variable name to its Statement
+        self.referenced_vars = None  # Variables any object may refer to
+
+        # Map each tag we can convert to the method that converts it.
+        svg_handlers = {
+            'circle': self.convert_circle,
+            'ellipse': self.convert_ellipse,
+            'rect': self.convert_rectangle,
+            'line': self.convert_line,
+            'polyline': lambda n: self.convert_poly(n, 'polyline'),
+            'polygon': lambda n: self.convert_poly(n, 'polygon'),
+            'path': self.convert_path,
+            'text': self.convert_text,
+            'image': self.convert_image,
+            'foreignObject': self.convert_foreign,
+            'use': self.convert_clone,
+            'g': self.convert_group,
+            'filter': self.convert_filter,
+            'linearGradient': self.convert_linear_gradient,
+            'radialGradient': self.convert_radial_gradient,
+            'clipPath': self.convert_clip_path,
+            'marker': self.convert_marker,
+            'a': self.convert_hyperlink
+        }
+        if hasattr(inkex, 'Mask'):
+            svg_handlers['mask'] = self.convert_mask  # Inkscape 1.2+
+        self._handlers = {inkex.addNS(t, 'svg'): h
+                          for t, h in svg_handlers.items()}
+        self._handlers.update({
+            inkex.addNS('path-effect', 'inkscape'): self.convert_path_effect,
+            inkex.addNS('guide', 'sodipodi'): self.convert_guide
+        })
+
     class Statement(object):
         '''Represent a Python statement (or multiple related statements)
         plus dependencies.'''
 
-        # The following characters are not allowed in Python variable names.
-        no_var_re = re.compile(r'\W')
-
         def __init__(self, code, obj_id=None, dep_ids=None):
             '''Associate an array of code lines with the source SVG object
             ID and any SVG object IDs upon which the SVG object depends.'''
@@ -65,16 +190,13 @@ class SvgToPythonScript(inkex.OutputExtension):
                 self.code[0] = '%s = %s' % (self.var_name, self.code[0])
             return '\n'.join(self.code)
 
-        @classmethod
-        def id2var(self, obj_id):
+        @staticmethod
+        def id2var(obj_id):
             """Return an Inkscape object's ID as a Python variable name.
             Return None if given None."""
             if obj_id is None:
                 return None
-            var = self.no_var_re.sub(r'_', obj_id)
-            if var[0].isdigit():
-                var[0] = '_'
-            return var
+            return _id2var(obj_id)
 
         def identify_dependents(self, var2stmt):
             '''Acquire a list of all dependent statements, and notify each
@@ -94,6 +216,45 @@ class SvgToPythonScript(inkex.OutputExtension):
                 except KeyError:
                     pass
 
+    def new_statement(self, code, obj_id=None, dep_ids=None):
+        '''Create a Statement and register it under its variable name for
+        subsequent dependency resolution.'''
+        stmt = self.Statement(code, obj_id, dep_ids)
+        if stmt.var_name is not None:
+            self.var2stmt[stmt.var_name] = stmt
+        return stmt
+
+    def find_referenced_vars(self):
+        '''Return the set of variable names of all objects that are
+        referenced by some other object's attributes.  The result may
+        include names that are not ultimately needed but never omits a
+        name that is.'''
+        ref_ids = set()
+        for node in self.svg.iter():
+            if not isinstance(node.tag, str):
+                continue  # Skip comments and processing instructions.
+
+            # Gather "url(#...)" and "#..." references from all attributes.
+            for val in node.attrib.values():
+                if '#' not in val:
+                    continue
+                ref_ids.update(_url_ref_re.findall(val))
+                if val[:1] == '#':
+                    ref_ids.update([r.strip()[1:] for r in val.split(';')])
+        return {_id2var(r) for r in ref_ids if r}
+
+    def is_unreferenced(self, node):
+        '''Return True if no other object can refer to the given node, in
+        which case there is no need to convert a node that is only a
+        definition.'''
+        if self.referenced_vars is None:
+            return False
+        parent = node.getparent()
+        if parent is not None and parent.tag in _CONTAINER_TAGS:
+            return False  # The container's code refers to the node.
+        return (self.Statement.id2var(node.get_id())
+                not in self.referenced_vars)
+
     def number_to_pixels(self, val, pct_of=None, default=None):
         '''Convert a textual number that may include units (e.g., "3mm") to a
         floating-point number of pixels.'''
@@ -208,9 +369,13 @@ class SvgToPythonScript(inkex.OutputExtension):
             val = node.get(attr)
             if val is not None:
                 k = attr.replace('-', '_')
-                style_dict[k] = str(self._svg_str_to_python(val))
+                style_dict[k] = str(_svg_str_to_python(val))
 
         # Append styles specified in the style string to the dictionary.
+        # Hoist attribute lookups out of the loop as styles can be long.
+        set_style = style_dict.__setitem__
+        quote = repr
+        is_number = _num_re.fullmatch
         if style is not None:
             for term in style.split(';'):
                 # Convert the key from SVG to Python syntax.
@@ -218,35 +383,36 @@ class SvgToPythonScript(inkex.OutputExtension):
                 k = k.replace('-', '_')
 
                 # Convert the value from a string to another type if possible.
-                try:
+                if is_number(v.strip()):
                     # Number -- format and use.
-                    style_dict[k] = '%.10g' % float(v)
-                except ValueError:
-                    # String -- quote if not already quoted.
-                    try:
-                        if (v[0] == "'" and v[-1] == "'") or \
-                           (v[0] == '"' and v[-1] == '"'):
-                            style_dict[k] = v
-                        else:
-                            style_dict[k] = repr(v)
-                    except IndexError:
-                        pass
+                    set_style(k, '%.10g' % float(v))
+                elif len(v) >= 2 and v[0] in '"\'' and v[-1] == v[0]:
+                    # String -- already quoted.
+                    set_style(k, v)
+                elif v:
+                    # String -- quote.
+                    set_style(k, quote(v))
 
         # Remove key=value pairs that are Simple Inkscape Scripting defaults.
-        for k, v in def_sis_style.items():
+        if def_sis_style is self._common_sis_defaults:
+            def_sis_repr = self._common_sis_defaults_repr
+        else:
+            def_sis_repr = {k: quote(v) for k, v in def_sis_style.items()}
+        for k, v in def_sis_repr.items():
             try:
-                if style_dict[k] == repr(v):
+                if style_dict[k] == v:
                     del style_dict[k]
             except KeyError:
                 pass
 
         # Replace "url(#...)" values with object references.
+        id2var = self.Statement.id2var
         url_ids = set()
         for k, v in style_dict.items():
-            if v is not None and v[:6] == "'url(#":
+            if v is not None and v.startswith("'url(#"):
                 v = v[6:-2]
                 url_ids.add(v)
-                style_dict[k] = self.Statement.id2var(v)
+                style_dict[k] = id2var(v)
 
         # Convert the dictionary to a list of function arguments.
         args = ''.join([', %s=%s' % kv for kv in style_dict.items()])
@@ -268,18 +434,14 @@ class SvgToPythonScript(inkex.OutputExtension):
                 clip_args,
                 mask_args,
                 style_args]
-        deps = set()
-        deps.update(c_deps)
-        deps.update(m_deps)
-        deps.update(s_deps)
-        return ''.join(args), list(deps)
+        deps = list(dict.fromkeys([*c_deps, *m_deps, *s_deps]))
+        return ''.join(args), deps
 
     def set_within_marker(self, node):
-        '''Recursively mark a node and all its children as lying within an
-        SVG <marker> element.'''
-        node.set('sis_within_marker', 'true')
-        for child in node:
-            self.set_within_marker(child)
+        '''Mark a node and all its descendants as lying within an SVG
+        <marker> element.'''
+        for n in node.iter():
+            n.set('sis_within_marker', 'true')
 
     def convert_circle(self, node):
         'Return Python code for drawing a circle.'
@@ -293,8 +455,8 @@ class SvgToPythonScript(inkex.OutputExtension):
         cy = self.number_to_pixels(node.get('cy'), pct_of='ht', default=0)
         r = self.number_to_pixels(node.get('r'), default=0)
         extra, extra_deps = self.extra_args(node)
-        code = ['circle((%.10g, %.10g), %.10g%s)' % (cx, cy, r, extra)]
-        return self.Statement(code, node.get_id(), extra_deps)
+        code = [f'circle(({cx:.10g}, {cy:.10g}), {r:.10g}{extra})']
+        return self.new_statement(code, node.get_id(), extra_deps)
 
     def convert_ellipse(self, node):
         'Return Python code for drawing an ellipse.'
@@ -303,9 +465,9 @@ class SvgToPythonScript(inkex.OutputExtension):
         rx = self.number_to_pixels(node.get('rx'), pct_of='wd')
         ry = self.number_to_pixels(node.get('ry'), pct_of='ht')
         extra, extra_deps = self.extra_args(node)
-        code = ['ellipse((%.10g, %.10g), (%.10g, %.10g)%s)' %
-                (cx, cy, rx, ry, extra)]
-        return self.Statement(code, node.get_id(), extra_deps)
+        code = [f'ellipse(({cx:.10g}, {cy:.10g}), ({rx:.10g}, {ry:.10g})'
+                f'{extra})']
+        return self.new_statement(code, node.get_id(), extra_deps)
 
     def convert_rectangle(self, node):
         'Return Python code for drawing a rectangle.'
@@ -319,16 +481,16 @@ class SvgToPythonScript(inkex.OutputExtension):
         # Handle the optional corner-rounding parameter.
         rx, ry = node.get('rx'), node.get('ry')
         if rx is not None and ry is not None:
-            extra = ', round=(%s, %s)%s' % (rx, ry, extra)
+            extra = f', round=({rx}, {ry}){extra}'
         elif rx is not None:
-            extra = ', round=%s%s' % (rx, extra)
+            extra = f', round={rx}{extra}'
         elif ry is not None:
-            extra = ', round=%s%s' % (ry, extra)
+            extra = f', round={ry}{extra}'
 
         # Return a complete call to rect.
-        code = ['rect((%.10g, %.10g), (%.10g, %.10g)%s)' %
-                (x, y, x + wd, y + ht, extra)]
-        return self.Statement(code, node.get_id(), extra_deps)
+        code = [f'rect(({x:.10g}, {y:.10g}), ({x + wd:.10g}, {y + ht:.10g})'
+                f'{extra})']
+        return self.new_statement(code, node.get_id(), extra_deps)
 
     def convert_line(self, node):
         'Return Python code for drawing a line.'
@@ -337,20 +499,18 @@ class SvgToPythonScript(inkex.OutputExtension):
         x2 = self.number_to_pixels(node.get('x2'), pct_of='wd', default=0)
         y2 = self.number_to_pixels(node.get('y2'), pct_of='ht', default=0)
         extra, extra_deps = self.extra_args(node)
-        code = ['line((%.10g, %.10g), (%.10g, %.10g)%s)' %
-                (x1, y1, x2, y2, extra)]
-        return self.Statement(code, node.get_id(), extra_deps)
+        code = [f'line(({x1:.10g}, {y1:.10g}), ({x2:.10g}, {y2:.10g})'
+                f'{extra})']
+        return self.new_statement(code, node.get_id(), extra_deps)
 
     def convert_poly(self, node, poly):
         'Return Python code for drawing a polyline or polygon.'
-        points_str = node.get('points').strip()
-        toks = self.sep_re.split(points_str)
-        pts = []
-        for i in range(0, len(toks), 2):
-            pts.append('(%s, %s)' % (toks[i], toks[i + 1]))
+        points_str = node.get('points')
+        pts = ', '.join([f'({x}, {y})'
+                         for x, y in self._pt_pair_re.findall(points_str)])
         extra, extra_deps = self.extra_args(node)
-        code = ['%s([%s]%s)' % (poly, ', '.join(pts), extra)]
-        return self.Statement(code, node.get_id(), extra_deps)
+        code = [f'{poly}([{pts}]{extra})']
+        return self.new_statement(code, node.get_id(), extra_deps)
 
     def convert_arc(self, node):
         'Return Python code for drawing an arc.'
@@ -361,13 +521,12 @@ class SvgToPythonScript(inkex.OutputExtension):
         if arc_type is None:
             arc_type = 'slice'
         extra, extra_deps = self.extra_args(node)
-        code = 'arc((%s, %s), (%s, %s), (%s, %s)' % \
-            (cx, cy, rx, ry, ang1, ang2)
+        code = f'arc(({cx}, {cy}), ({rx}, {ry}), ({ang1}, {ang2})'
         if arc_type != 'arc':
-            code += ', arc_type=%s' % repr(arc_type)
+            code += f', arc_type={arc_type!r}'
         code += extra + ')'
         code = [code]
-        return self.Statement(code, node.get_id(), extra_deps)
+        return self.new_statement(code, node.get_id(), extra_deps)
 
     def convert_poly_star(self, node):
         'Return Python code for drawing either a regular polygon or a star.'
@@ -381,62 +540,54 @@ class SvgToPythonScript(inkex.OutputExtension):
         rand = node.get('inkscape:randomized')
         extra, extra_deps = self.extra_args(node)
 
-        # Construct a list of optional arguments.  We always include
+        # Construct a string of optional arguments.  We always include
         # the angle, though.
-        opt_args = []
+        opt_arg_str = ''
         if rnd is not None and float(rnd) != 0.0:
-            opt_args.append('round=%s' % rnd)
+            opt_arg_str += f', round={rnd}'
         if rand is not None and float(rand) != 0.0:
-            opt_args.append('random=%s' % rand)
-        opt_arg_str = ''
-        if opt_args != []:
-            opt_arg_str = ', ' + ', '.join(opt_args)
+            opt_arg_str += f', random={rand}'
 
         # Produce either a regular polygon or a star.
         if flat == 'true':
             # Regular polygon
-            code = ['regular_polygon(%s, (%s, %s), %s, angles=%s%s%s)' %
-                    (sides, cx, cy, r1, arg1, opt_arg_str, extra)]
+            code = [f'regular_polygon({sides}, ({cx}, {cy}), {r1}, '
+                    f'angles={arg1}{opt_arg_str}{extra})']
         else:
             # Star
-            code = ['star(%s, (%s, %s), (%s, %s), angles=(%s, %s)%s%s)' %
-                    (sides, cx, cy, r1, r2, arg1, arg2, opt_arg_str, extra)]
-        return self.Statement(code, node.get_id(), extra_deps)
+            code = [f'star({sides}, ({cx}, {cy}), ({r1}, {r2}), '
+                    f'angles=({arg1}, {arg2}){opt_arg_str}{extra})']
+        return self.new_statement(code, node.get_id(), extra_deps)
 
     def convert_connector(self, node):
         'Return Python code for drawing a connector between objects.'
         # Process the required arguments.
+        id2var = self.Statement.id2var
         id1 = node.get('inkscape:connection-start')[1:]
-        var1 = self.Statement.id2var(id1)
+        var1 = id2var(id1)
         id2 = node.get('inkscape:connection-end')[1:]
-        var2 = self.Statement.id2var(id2)
+        var2 = id2var(id2)
 
         # Process the optional arguments.
-        opt_args = []
+        opt_arg_str = ''
         ctype = node.get('inkscape:connector-type')
         if ctype is not None and ctype != 'polyline':
-            opt_args.append('ctype=%s' % repr(ctype))
+            opt_arg_str += f', ctype={ctype!r}'
         curve = node.get('inkscape:connector-curvature')
         if curve is not None and float(curve) != 0:
-            opt_args.append('curve=%s' % curve)
-        opt_arg_str = ''
-        if opt_args != []:
-            opt_arg_str = ', ' + ', '.join(opt_args)
+            opt_arg_str += f', curve={curve}'
         extra, extra_deps = self.extra_args(node)
 
         # Generate a Statement for the connector.
-        code = ['connector(%s, %s%s%s)' %
-                (var1, var2, opt_arg_str, extra)]
-        return self.Statement(code, node.get_id(), [id1, id2] + extra_deps)
+        code = [f'connector({var1}, {var2}{opt_arg_str}{extra})']
+        return self.new_statement(code, node.get_id(), [id1, id2] + extra_deps)
 
     def convert_path(self, node):
         'Return Python code for drawing a path.'
-        # Handle the special case of an arc.
-        ptype = node.get('sodipodi:type')
-        if ptype == 'arc':
-            return self.convert_arc(node)
-        if ptype == 'star':
-            return self.convert_poly_star(node)
+        # Handle the special cases of arcs, stars, and connectors.
+        handler = self._path_dispatch.get(node.get('sodipodi:type'))
+        if handler is not None:
+            return getattr(self, handler)(node)
         if node.get('inkscape:connector-type') is not None:
             return self.convert_connector(node)
 
@@ -450,8 +601,8 @@ class SvgToPythonScript(inkex.OutputExtension):
                 # Specify an explicit namespace for path command names that
                 # conflict with Simple Inkscape Scripting command names.
                 cmd_name = 'inkex.paths.' + cmd_name
-            cmds.append('%s(%s)' %
-                        (cmd_name, ', '.join([str(a) for a in c.args])))
+            args = ', '.join(map(str, c.args))
+            cmds.append(f'{cmd_name}({args})')
         extra, extra_deps = self.extra_args(node)
 
         # Depend on any path effects applied to the path.
@@ -463,33 +614,42 @@ class SvgToPythonScript(inkex.OutputExtension):
             extra_deps.extend(pe_list)
 
         # Generate code and wrap it in a statement.
-        code = ['path([%s]%s)' % (', '.join(cmds), extra)]
+        cmds_str = ', '.join(cmds)
+        code = [f'path([{cmds_str}]{extra})']
+        id2var = self.Statement.id2var
+        node_id = node.get_id()
         if len(pe_list) == 1:
-            code.append('%s.apply_path_effect(%s)' %
-                        (self.Statement.id2var(node.get_id()),
-                         self.Statement.id2var(pe_list[0])))
+            var_name = id2var(node_id)
+            pe_var = id2var(pe_list[0])
+            code.append(f'{var_name}.apply_path_effect({pe_var})')
         elif len(pe_list) > 1:
-            pe_list_str = ', '.join([self.Statement.id2var(pe)
-                                    for pe in pe_list])
-            code.append('%s.apply_path_effect([%s])' %
-                        (self.Statement.id2var(node.get_id()),
-                         pe_list_str))
-        stmt = self.Statement(code, node.get_id(), extra_deps)
-        if pe_list != []:
+            var_name = id2var(node_id)
+            pe_list_str = ', '.join([id2var(pe) for pe in pe_list])
+            code.append(f'{var_name}.apply_path_effect([{pe_list_str}])')
+        stmt = self.new_statement(code, node_id, extra_deps)
+        if pe_list:
             stmt.need_var_name = True
         return stmt
 
     def convert_text(self, node):
         'Return Python code for drawing text.'
+        # Walk the text's subtree once, collecting <textPath> references
+        # and <tspan> elements.
+        tpaths = []
+        tspans = []
+        for c in node.iter():
+            tag = c.tag
+            if tag == _TEXTPATH:
+                tpaths.append(c.get('xlink:href')[1:])
+            elif tag == _TSPAN:
+                tspans.append(c)
+
         # Determine if the text lies on a path.
-        tpaths = [c.get('xlink:href')[1:]
-                  for c in node.iter()
-                  if c.tag[-8:] == 'textPath']
-        if tpaths != []:
-            tpath_str = ', path=%s' % self.Statement.id2var(tpaths[0])
+        if tpaths:
+            tpath_str = f', path={self.Statement.id2var(tpaths[0])}'
         else:
             tpath_str = ''
-        all_deps = set(tpaths)
+        all_deps = list(tpaths)
 
         # Convert the initial text object.
         x = self.number_to_pixels(node.get('x'), pct_of='wd', default=0)
@@ -498,16 +658,16 @@ class SvgToPythonScript(inkex.OutputExtension):
         if msg is None:
             msg = ''
         extra, extra_deps = self.extra_args(node, {}, {})
-        code = ['text(%s, (%.10g, %.10g)%s%s)' %
-                (repr(msg), x, y, tpath_str, extra)]
-        all_deps = all_deps.union(extra_deps)
+        code = [f'text({msg!r}, ({x:.10g}, {y:.10g}){tpath_str}{extra})']
+        all_deps.extend(extra_deps)
 
         # Convert all sub-text objects.  We assume that <tspan> tags are
         # not nested.  (SVG allows this, but it's not currently supported
         # by Simple Inkscape Scripting.)
-        var_name = self.Statement.id2var(node.get_id())
+        node_id = node.get_id()
+        var_name = self.Statement.id2var(node_id)
         need_var_name = False
-        for tspan in [c for c in node.iter() if c.tag[-5:] == 'tspan']:
+        for tspan in tspans:
             if tspan.text is not None:
                 # The text within a <tspan> can have a specified position
                 # and style.
@@ -517,21 +677,22 @@ class SvgToPythonScript(inkex.OutputExtension):
                 y = self.number_to_pixels(tspan.get('y'),
                                           pct_of='ht', default=0)
                 extra, extra_deps = self.extra_args(tspan, {})
-                all_deps = all_deps.union(extra_deps)
+                all_deps.extend(extra_deps)
                 if x is not None and y is not None:
                     # Specified position
-                    code.append('%s.add_text(%s, (%.10g, %.10g)%s)' %
-                                (var_name, repr(tspan.text), x, y, extra))
+                    code.append(f'{var_name}.add_text({tspan.text!r}, '
+                                f'({x:.10g}, {y:.10g}){extra})')
                 else:
                     # Unspecified position
-                    code.append('%s.add_text(%s%s)' %
-                                (var_name, repr(tspan.text), extra))
+                    code.append(f'{var_name}.add_text({tspan.text!r}'
+                                f'{extra})')
             if tspan.tail is not None:
                 # The text following a <tspan> has neither a specified
                 # position nor style.
                 need_var_name = True
-                code.append('%s.add_text(%s)' % (var_name, repr(tspan.tail)))
-        stmt = self.Statement(code, node.get_id(), sorted(all_deps))
+                code.append(f'{var_name}.add_text({tspan.tail!r})')
+        stmt = self.new_statement(code, node_id,
+                                  sorted(dict.fromkeys(all_deps)))
         if need_var_name:
             stmt.need_var_name = True
         return stmt
@@ -543,22 +704,19 @@ class SvgToPythonScript(inkex.OutputExtension):
         href = node.get('xlink:href')
         absref = node.get('sodipodi:absref')
         extra, extra_deps = self.extra_args(node, {}, {})
-        if href is not None and href[:5] == 'data:':
+        if href is not None and href.startswith('data:'):
             # Embedded image.  Note that we specify False for the embed
             # parameter.  This is because Inkscape has already discarded
             # the original filename.  Hence, we are effectively requesting
             # a non-embeded image described by a data URL.
-            code = ['image(%s, (%s, %s), embed=False%s)' %
-                    (repr(href), x, y, extra)]
+            code = [f'image({href!r}, ({x}, {y}), embed=False{extra})']
         elif absref is not None:
             # Non-embedded image.  We were given the original filename.
-            code = ['image(%s, (%s, %s), embed=False%s)' %
-                    (repr(absref), x, y, extra)]
+            code = [f'image({absref!r}, ({x}, {y}), embed=False{extra})']
         else:
             # Non-embedded image.  We were given a URL but not a filename.
-            code = ['image(%s, (%s, %s), embed=False%s)' %
-                    (repr(href), x, y, extra)]
-        return self.Statement(code, node.get_id(), extra_deps)
+            code = [f'image({href!r}, ({x}, {y}), embed=False{extra})']
+        return self.new_statement(code, node.get_id(), extra_deps)
 
     def convert_foreign(self, node):
         'Return Python code for including XML from a foreign namespace.'
@@ -579,17 +737,17 @@ class SvgToPythonScript(inkex.OutputExtension):
             pass
 
         # Return a complete call to foreign.
-        code = ['foreign((%.10g, %.10g), (%.10g, %.10g)%s)' %
-                (x, y, x + wd, y + ht, extra)]
-        return self.Statement(code, node.get_id(), extra_deps)
+        code = [f'foreign(({x:.10g}, {y:.10g}), ({x + wd:.10g}, {y + ht:.10g})'
+                f'{extra})']
+        return self.new_statement(code, node.get_id(), extra_deps)
 
     def convert_clone(self, node):
         'Return Python code for cloning an object.'
         href = node.get('xlink:href')[1:]
         var = self.Statement.id2var(href)
         extra, extra_deps = self.extra_args(node, {}, {})
-        code = ['clone(%s%s)' % (var, extra)]
-        return self.Statement(code, node.get_id(), [href] + extra_deps)
+        code = [f'clone({var}{extra})']
+        return self.new_statement(code, node.get_id(), [href] + extra_deps)
 
     def convert_group(self, node):
         'Return Python code for grouping objects.'
@@ -598,9 +756,9 @@ class SvgToPythonScript(inkex.OutputExtension):
             return None
         extra, extra_deps = self.extra_args(node, {}, {})
         child_ids = [c.get_id() for c in node if hasattr(c, 'get_id')]
-        child_vars = [self.Statement.id2var(i) for i in child_ids]
-        code = ['group([%s]%s)' % (', '.join(child_vars), extra)]
-        return self.Statement(code, node.get_id(), child_ids + extra_deps)
+        child_vars = ', '.join(map(self.Statement.id2var, child_ids))
+        code = [f'group([{child_vars}]{extra})']
+        return self.new_statement(code, node.get_id(), child_ids + extra_deps)
 
     def convert_filter(self, node):
         'Return Python code that defines a filter.'
@@ -608,14 +766,14 @@ class SvgToPythonScript(inkex.OutputExtension):
         filt_args = []
         if node.label is not None and node.label != '':
             filt_args.append('name=%s' % repr(node.label))
-        x, y = node.get('x'), node.get('y')
+        xs, ys = node.get('x'), node.get('y')
         wd, ht = node.get('width'), node.get('height')
-        if x is not None and y is not None:
-            filt_args.append('pt1=(%s, %s)' % (x, y))
+        if xs is not None and ys is not None:
+            filt_args.append(f'pt1=({xs}, {ys})')
         if wd is not None and ht is not None:
-            x0, y0 = float(x or 0), float(y or 0)
-            x1, y1 = x0 + float(wd), y0 + float(ht)
-            filt_args.append('pt2=(%s, %s)' % (x1, y1))
+            x0 = float(xs) if xs else 0.0
+            y0 = float(ys) if ys else 0.0
+            filt_args.append(f'pt2=({x0 + float(wd)}, {y0 + float(ht)})')
         f_units, p_units = node.get('filterUnits'), node.get('primitiveUnits')
         if f_units is not None:
             filt_args.append('filter_units=%s' % repr(f_units))
@@ -629,7 +787,10 @@ class SvgToPythonScript(inkex.OutputExtension):
             filt_args.append(extra[2:])  # Drop the leading ", ".
         code = ['filter_effect(%s)' % ', '.join(filt_args)]
         id2var = self.Statement.id2var
-        filt_name = id2var(node.get_id())
+        is_number = _num_re.fullmatch
+        has_sep = self.sep_re.search
+        node_id = node.get_id()
+        filt_name = id2var(node_id)
 
         class Primitive(object):
             'Represent a single filter primitive.'
@@ -645,14 +806,22 @@ class SvgToPythonScript(inkex.OutputExtension):
             def _attrib2py(self, key, val):
                 "Convert an attribute's key and value to a Python tuple."
                 key_str = key.replace('-', '_')
+
+                # Handle the common case of a single token without
+                # building a list.
+                if val and has_sep(val) is None:
+                    if is_number(val):
+                        return key_str, val
+                    return key_str, repr(val)
+
+                # Handle the general case of a list of tokens.
                 val_list = []
                 for v in val.split():
-                    try:
+                    if is_number(v):
                         # If the value is convertible to a float, append it
                         # verbatim.
-                        vf = float(v)
                         val_list.append(v)
-                    except ValueError:
+                    else:
                         # If the value is not convertible to a float, quote it
                         # as a string and append it.
                         val_list.append(repr(v))
@@ -663,38 +832,34 @@ class SvgToPythonScript(inkex.OutputExtension):
 
             def __str__(self):
                 # Invoke the add method on the filter_effect object.
-                code = '%s.add(%s' % (filt_name, repr(self.prim.tag_name[2:]))
+                parts = ['%s.add(%s' % (filt_name,
+                                        repr(self.prim.tag_name[2:]))]
 
                 # Specially handle src1 and src2.  These point to
                 # either a named filter primitive or a string.
-                if self.src1 is not None:
-                    if self.src1 in self.var2prim:
-                        code += ', src1=%s' % self.src1
-                    else:
-                        code += ', src1=%s' % repr(self.src1)
-                if self.src2 is not None:
-                    if self.src2 in self.var2prim:
-                        code += ', src2=%s' % self.src2
-                    else:
-                        code += ', src2=%s' % repr(self.src2)
+                var2prim = self.var2prim
+                for key, src in (('src1', self.src1), ('src2', self.src2)):
+                    if src is not None:
+                        src_str = src if src in var2prim else repr(src)
+                        parts.append(f', {key}={src_str}')
 
                 # Append all remaining attributes.
                 for k, v in self.prim.items():
                     if k not in ['in', 'in2', 'result', 'id']:
-                        code += ', %s=%s' % self._attrib2py(k, v)
-                code += ')'
+                        parts.append(', %s=%s' % self._attrib2py(k, v))
+                parts.append(')')
 
                 # If the primitive contains any child options, add these, too.
                 if len(self.prim) > 0:
                     self.need_var_name = True
                 for opt in self.prim:
-                    code += '\n'
-                    ftype = opt.tag[opt.tag.rindex('fe') + 2:]
-                    code += '%s.add(%s' % (self.var_name, repr(ftype))
+                    ftype = opt.tag.rsplit('}', 1)[-1][2:]
+                    parts.append('\n%s.add(%s' % (self.var_name, repr(ftype)))
                     for k, v in opt.items():
                         if k != 'id':
-                            code += ', %s=%s' % self._attrib2py(k, v)
-                    code += ')'
+                            parts.append(', %s=%s' % self._attrib2py(k, v))
+                    parts.append(')')
+                code = ''.join(parts)
 
                 # Assign a variable name if it was referenced.
                 if self.need_var_name:
@@ -711,24 +876,24 @@ class SvgToPythonScript(inkex.OutputExtension):
                 continue
             pobj = Primitive(prim, var2prim)
             prim_list.append(pobj)
-            if pobj.src1 is not None and pobj.src1 in var2prim:
-                var2prim[pobj.src1].need_var_name = True
-            if pobj.src2 is not None and pobj.src2 in var2prim:
-                var2prim[pobj.src2].need_var_name = True
+            for src in (pobj.src1, pobj.src2):
+                target = var2prim.get(src)
+                if target is not None:
+                    target.need_var_name = True
             var2prim[pobj.var_name] = pobj
         for pobj in prim_list:
             code.append(str(pobj))
 
         # Construct and return a Statement.
-        stmt = self.Statement(code, node.get_id(), extra_deps)
+        stmt = self.new_statement(code, node_id, extra_deps)
         stmt.need_var_name = True  # Always needed by filter primitives
         return stmt
 
     def _common_gradient_args(self, node):
         '''Return a list of arguments common to linear and radial gradients
-        and a set of dependent objects.'''
+        and a list of dependent objects.'''
         grad_args = []
-        deps = set()
+        deps = []
         spread = node.get('spreadMethod')
         if spread is not None and spread != 'pad':
             spread_to_repeat = {'reflect': 'reflected',
@@ -743,27 +908,27 @@ class SvgToPythonScript(inkex.OutputExtension):
         if template is not None:
             template = template[1:]  # Drop the "#".
             grad_args.append('template=%s' % template)
-            deps.add(template)
+            deps.append(template)
         xform = node.get('gradientTransform')
         if xform is not None:
             grad_args.append('transform=%s' % repr(xform))
         extra, extra_deps = self.extra_args(node, {}, {})
         if extra != '':
             grad_args.append(extra[2:])  # Drop the leading ", ".
-            deps = deps.union(extra_deps)
+            deps.extend(extra_deps)
         return grad_args, deps
 
     def _gradient_stops(self, node):
-        '''Return code for adding gradient stops and a set of dependent
+        '''Return code for adding gradient stops and a list of dependent
         objects.'''
         code = []
-        deps = set()
+        deps = []
         var_name = self.Statement.id2var(node.get_id())
         for stop in node:
             # The stop offset is a mandatory field.
             if not isinstance(stop, inkex.Stop):
                 continue
-            stop_args = [str(self._svg_str_to_python(str(stop.offset)))]
+            stop_args = [str(_svg_str_to_python(str(stop.offset)))]
 
             # stop-color and stop-opacity can be expressed directly or
             # within a style.  We therefore have to look in both places.
@@ -788,13 +953,24 @@ class SvgToPythonScript(inkex.OutputExtension):
                 stop_args.append('opacity=%s' % opacity)
 
             # Construct a call to add_stop.
-            deps = deps.union(style_deps)
+            deps.extend(style_deps)
             code.append('%s.add_stop(%s%s)' %
                         (var_name, ', '.join(stop_args), style_str))
         return code, deps
 
+    def _is_unreferenced_gradient(self, node):
+        '''Return True if a gradient has no stops (which would force its
+        variable name to be used) and nothing refers to it.'''
+        for stop in node:
+            if isinstance(stop, inkex.Stop):
+                return False
+        return self.is_unreferenced(node)
+
     def convert_linear_gradient(self, node):
         'Return Python code that defines a linear gradient.'
+        if self._is_unreferenced_gradient(node):
+            return None
+
         # Generate code for the linear-gradient object proper.
         grad_args = []
         x1, y1 = node.get('x1'), node.get('y1')
@@ -810,11 +986,12 @@ class SvgToPythonScript(inkex.OutputExtension):
         # Generate code for each stop.
         more_code, more_deps = self._gradient_stops(node)
         code.extend(more_code)
-        all_deps = all_deps.union(more_deps)
-        have_stops = more_code != []
+        all_deps.extend(more_deps)
+        have_stops = bool(more_code)
 
         # Construct and return a Statement.
-        stmt = self.Statement(code, node.get_id(), all_deps)
+        stmt = self.new_statement(code, node.get_id(),
+                                  list(dict.fromkeys(all_deps)))
         if have_stops:
             stmt.need_var_name = True
         stmt.delete_if_unused = True
@@ -822,6 +999,9 @@ class SvgToPythonScript(inkex.OutputExtension):
 
     def convert_radial_gradient(self, node):
         'Return Python code that defines a radial gradient.'
+        if self._is_unreferenced_gradient(node):
+            return None
+
         # Generate code for the radial-gradient object proper.
         grad_args = []
         cx, cy = node.get('cx'), node.get('cy')
@@ -843,11 +1023,12 @@ class SvgToPythonScript(inkex.OutputExtension):
         # Generate code for each stop.
         more_code, more_deps = self._gradient_stops(node)
         code.extend(more_code)
-        all_deps = all_deps.union(more_deps)
-        have_stops = more_code != []
+        all_deps.extend(more_deps)
+        have_stops = bool(more_code)
 
         # Construct and return a Statement.
-        stmt = self.Statement(code, node.get_id(), all_deps)
+        stmt = self.new_statement(code, node.get_id(),
+                                  list(dict.fromkeys(all_deps)))
         if have_stops:
             stmt.need_var_name = True
         stmt.delete_if_unused = True
@@ -855,25 +1036,29 @@ class SvgToPythonScript(inkex.OutputExtension):
 
     def convert_clip_path(self, node):
         'Return Python code that defines a clipping path.'
+        if self.is_unreferenced(node):
+            return None
         p_var = self.Statement.id2var(node[0].get_id())
         c_units = node.get('clipPathUnits')
         if c_units is None:
             code = ['clip_path(%s)' % p_var]
         else:
             code = ['clip_path(%s, clip_units=%s)' % (p_var, repr(c_units))]
-        stmt = self.Statement(code, node.get_id(), [p_var])
+        stmt = self.new_statement(code, node.get_id(), [p_var])
         stmt.delete_if_unused = True
         return stmt
 
     def convert_mask(self, node):
         'Return Python code that defines a mask.'
+        if self.is_unreferenced(node):
+            return None
         m_var = self.Statement.id2var(node[0].get_id())
         m_units = node.get('maskUnits')
         if m_units is None:
             code = ['mask(%s)' % m_var]
         else:
             code = ['mask(%s, mask_units=%s)' % (m_var, repr(m_units))]
-        stmt = self.Statement(code, node.get_id(), [m_var])
+        stmt = self.new_statement(code, node.get_id(), [m_var])
         stmt.delete_if_unused = True
         return stmt
 
@@ -883,34 +1068,38 @@ class SvgToPythonScript(inkex.OutputExtension):
         # suppresses the use of default styles.
         for child in node:
             self.set_within_marker(child)
+        if self.is_unreferenced(node):
+            return None
 
         # Extract all of the parameters that define the shape.
-        x, y = node.get('refX'), node.get('refY')
-        orient = node.get('orient')
-        m_units = node.get('markerUnits')
-        v_box = node.get('viewBox')
+        attrs = dict(node.attrib)
+        x, y = attrs.get('refX'), attrs.get('refY')
+        orient = attrs.get('orient')
+        m_units = attrs.get('markerUnits')
+        v_box = attrs.get('viewBox')
         extra, extra_deps = self.extra_args(node, {}, {})
         shape_var = self.Statement.id2var(node[0].get_id())
 
         # Construct a list of optional arguments.
         marker_args = []
         if x is not None or y is not None:
-            marker_args.append('ref=(%s, %s)' % (x or '0', y or '0'))
+            marker_args.append(f"ref=({x or '0'}, {y or '0'})")
         if orient is not None:
-            marker_args.append('orient=%s' % repr(orient))
+            marker_args.append(f'orient={orient!r}')
         if m_units is not None:
-            marker_args.append('marker_units=%s' % repr(m_units))
+            marker_args.append(f'marker_units={m_units!r}')
         if v_box is not None:
-            x0, y0, wd, ht = [float(c) for c in v_box.split()]
-            marker_args.append('view_box=((%.10g, %.10g), (%.10g, %.10g))' %
-                               (x0, y0, x0 + wd, y0 + ht))
+            x0, y0, wd, ht = _parse_nums(v_box)
+            marker_args.append(f'view_box=(({x0:.10g}, {y0:.10g}), '
+                               f'({x0 + wd:.10g}, {y0 + ht:.10g}))')
 
         # Generate code and wrap it in a statement.
         m_arg_str = ', '.join(marker_args)
         if m_arg_str != '':
             m_arg_str = ', ' + m_arg_str
-        code = ['marker(%s%s%s)' % (shape_var, m_arg_str, extra)]
-        stmt = self.Statement(code, node.get_id(), [shape_var] + extra_deps)
+        code = [f'marker({shape_var}{m_arg_str}{extra})']
+        stmt = self.new_statement(code, node.get_id(),
+                                  [shape_var] + extra_deps)
         stmt.delete_if_unused = True
         return stmt
 
@@ -918,73 +1107,68 @@ class SvgToPythonScript(inkex.OutputExtension):
         'Return Python code for wrapping objects within a hyperlink.'
         # Construct a list of arguments.
         link_args = []
-        href = node.get('href') or \
-            node.get('{http://www.w3.org/1999/xlink}href')
+        href = node.get('href') or node.get(_XLINK_HREF)
         link_args.append(repr(href))
-        try:
-            title = [c for c in node if c.TAG == 'title'][0].text
-        except IndexError:
-            title = node.get('{http://www.w3.org/1999/xlink}title')
+
+        # Separate the first <title> child, if any, from the children
+        # to wrap.
+        title_elt = None
+        child_ids = []
+        for c in node:
+            if c.TAG == 'title':
+                if title_elt is None:
+                    title_elt = c
+            else:
+                child_ids.append(c.get_id())
+        if title_elt is not None:
+            title = title_elt.text
+        else:
+            title = node.get(_XLINK_TITLE)
         if title is not None:
-            link_args.append('title=%s' % repr(title))
+            link_args.append(f'title={title!r}')
         target = node.get('target')
         if target is not None:
-            link_args.append('target=%s' % repr(target))
+            link_args.append(f'target={target!r}')
         mime_type = node.get('type')
         if mime_type is not None:
-            link_args.append('mime_type=%s' % repr(mime_type))
+            link_args.append(f'mime_type={mime_type!r}')
         link_args_str = ', '.join(link_args)
         extra, extra_deps = self.extra_args(node, {}, {})
 
         # Generate code and wrap it in a statement.
-        child_ids = [c.get_id() for c in node if c.TAG != 'title']
-        child_vars = [self.Statement.id2var(i) for i in child_ids]
+        child_vars = list(map(self.Statement.id2var, child_ids))
         if len(child_vars) == 1:
             child_vars_str = child_vars[0]
         else:
-            child_vars_str = '[%s]' % (', '.join(child_vars))
-        code = ['hyperlink(%s, %s%s)' %
-                (child_vars_str, link_args_str, extra)]
-        return self.Statement(code, node.get_id(), child_ids + extra_deps)
-
-    def _svg_str_to_python(self, str):
-        'Convert an SVG attribute string to an appropriate Python type.'
-        # Recursively convert lists.
-        fields = str.replace(',', ' ').replace(';', ' ').split()
-        if len(fields) > 1:
-            return [self._svg_str_to_python(f) for f in fields]
-
-        # Specially handle certain data types then fall back to strings.
-        try:
-            return int(str)
-        except ValueError:
-            pass
-        try:
-            return float(str)
-        except ValueError:
-            pass
-        try:
-            str2bool = {'true': True, 'false': False}
-            return str2bool[str]
-        except KeyError:
-            pass
-        return repr(str)
+            child_vars_str = f"[{', '.join(child_vars)}]"
+        code = [f'hyperlink({child_vars_str}, {link_args_str}{extra})']
+        return self.new_statement(code, node.get_id(), child_ids + extra_deps)
 
     def convert_path_effect(self, node):
         'Return Python code for instantiating a path effect.'
+        if self.is_unreferenced(node):
+            return None
+
         # Convert the path effect's attributes to Python keyword arguments.
-        args = [repr(node.get('effect'))]
-        str2bool = {'true': True, 'false': False}
-        for k, v in sorted(node.attrib.items()):
+        # Path effects of the same type tend to share a set of attribute
+        # keys, so we sort and rename each distinct key set only once.
+        attrib = node.attrib
+        keys = tuple(attrib.keys())
+        try:
+            key_order = self._path_effect_keys[keys]
+        except KeyError:
             # Skip "special" keys.
-            if k in ['effect', 'id']:
-                continue
-            k = k.replace('-', '_')
-            args.append('%s=%s' % (k, self._svg_str_to_python(v)))
+            key_order = [(k, k.replace('-', '_'))
+                         for k in sorted(keys)
+                         if k not in ['effect', 'id']]
+            self._path_effect_keys[keys] = key_order
+        args = [repr(node.get('effect'))]
+        for k, py_k in key_order:
+            args.append(f'{py_k}={_svg_str_to_python(attrib[k])}')
 
         # Generate code and wrap it in a statement.
-        code = ['path_effect(%s)' % ', '.join(args)]
-        stmt = self.Statement(code, node.get_id(), [])
+        code = [f"path_effect({', '.join(args)})"]
+        stmt = self.new_statement(code, node.get_id(), [])
         stmt.delete_if_unused = True
         return stmt
 
@@ -1017,7 +1201,7 @@ class SvgToPythonScript(inkex.OutputExtension):
             angle = 90 - math.degrees(node.orientation.angle)
         except AttributeError:
             # Inkscape 1.0 and 1.1
-            orient = [float(s) for s in node.get('orientation').split(',')]
+            orient = _parse_nums(node.get('orientation'))
             angle = 180 - math.degrees(math.atan2(orient[0], orient[1]))
             angle = -angle
 
@@ -1035,109 +1219,53 @@ class SvgToPythonScript(inkex.OutputExtension):
         # Generate code and wrap it in a statement.
         code = ['guides.append(guide((%.10g, %.10g), %.10g%s))' %
                 (pos[0], pos[1], angle, extra)]
-        return self.Statement(code, node.get_id(), [])
+        return self.new_statement(code, node.get_id(), [])
 
     def convert_all_shapes(self):
         'Convert each SVG shape to a Python statement.'
-        stmts = []
-        known_tags = ('//svg:circle | '
-                      '//svg:ellipse | '
-                      '//svg:rect | '
-                      '//svg:line | '
-                      '//svg:polyline | '
-                      '//svg:polygon | '
-                      '//svg:path | '
-                      '//svg:text | '
-                      '//svg:image | '
-                      '//svg:foreignObject | '
-                      '//svg:use | '
-                      '//svg:g | '
-                      '//svg:filter | '
-                      '//svg:linearGradient | '
-                      '//svg:radialGradient | '
-                      '//svg:clipPath | '
-                      '//svg:marker | '
-                      '//svg:a | '
-                      '//inkscape:path-effect | '
-                      '//sodipodi:guide')
-        if hasattr(inkex, 'Mask'):
-            known_tags += ' | //svg:mask'  # Inkscape 1.2+
-        for node in self.svg.xpath(known_tags):
-            if isinstance(node, inkex.Circle):
-                stmts.append(self.convert_circle(node))
-            elif isinstance(node, inkex.Ellipse):
-                stmts.append(self.convert_ellipse(node))
-            elif isinstance(node, inkex.Rectangle):
-                stmts.append(self.convert_rectangle(node))
-            elif isinstance(node, inkex.Line):
-                stmts.append(self.convert_line(node))
-            elif isinstance(node, inkex.Polyline):
-                stmts.append(self.convert_poly(node, 'polyline'))
-            elif isinstance(node, inkex.Polygon):
-                stmts.append(self.convert_poly(node, 'polygon'))
-            elif isinstance(node, inkex.PathElement):
-                stmts.append(self.convert_path(node))
-            elif isinstance(node, inkex.TextElement):
-                stmts.append(self.convert_text(node))
-            elif isinstance(node, inkex.Image):
-                stmts.append(self.convert_image(node))
-            elif isinstance(node, inkex.ForeignObject):
-                stmts.append(self.convert_foreign(node))
-            elif isinstance(node, inkex.Use):
-                stmts.append(self.convert_clone(node))
-            elif isinstance(node, inkex.Group):
-                stmts.append(self.convert_group(node))
-            elif isinstance(node, inkex.Filter):
-                stmts.append(self.convert_filter(node))
-            elif isinstance(node, inkex.LinearGradient):
-                stmts.append(self.convert_linear_gradient(node))
-            elif isinstance(node, inkex.RadialGradient):
-                stmts.append(self.convert_radial_gradient(node))
-            elif isinstance(node, inkex.ClipPath):
-                stmts.append(self.convert_clip_path(node))
-            elif hasattr(inkex, 'Mask') and isinstance(node, inkex.Mask):
-                stmts.append(self.convert_mask(node))  # Inkscape 1.2+
-            elif isinstance(node, inkex.Marker):
-                stmts.append(self.convert_marker(node))
-            elif isinstance(node, inkex.Anchor):
-                stmts.append(self.convert_hyperlink(node))
-            elif isinstance(node, inkex.PathEffect):
-                stmts.append(self.convert_path_effect(node))
-            elif isinstance(node, inkex.Guide):
-                stmts.append(self.convert_guide(node))
-            else:
-                raise inkex.AbortExtension(_('Internal error converting %s' %
-                                             repr(node)))
+        self.var2stmt = {}
+        if next(self.svg.iter(*_DEFINITION_TAGS), None) is None:
+            self.referenced_vars = None  # Nothing could be skipped.
+        else:
+            self.referenced_vars = self.find_referenced_vars()
+        handlers = self._handlers
+        stmts = [handlers[node.tag](node)
+                 for node in self.svg.iter(*handlers)]
         return [st for st in stmts if st is not None]
 
     def find_dependencies(self, code):
         'Find the Statements upon which each other Statement depends.'
-        # Construct a map from variable name to Statement.
-        var2stmt = {}
-        for st in code:
-            if st.var_name is not None:
-                var2stmt[st.var_name] = st
-
-        # Set need_var_name to True for each referenced Statement.
+        # Set need_var_name to True for each referenced Statement.  The
+        # map from variable name to Statement was built by new_statement.
+        var2stmt = self.var2stmt
         for st in code:
             st.identify_dependents(var2stmt)
 
-    def sort_statement_forest(self, code, seen=set()):
+    def sort_statement_forest(self, code):
         '''Return a list of statements with dependencies before dependents
         but otherwise maintaining the original order.'''
+        # Perform an iterative, post-order, depth-first traversal.  Each
+        # stack entry pairs a statement with a flag indicating whether its
+        # dependencies have already been pushed.
         ordered_code = []
-        for stmt in code:
-            # Ignore statements we've seen before.
+        seen = set()       # Statements already appended to ordered_code
+        visiting = set()   # Statements whose dependencies are in progress
+        stack = [(stmt, False) for stmt in reversed(code)]
+        while stack:
+            stmt, expanded = stack.pop()
             if stmt in seen:
                 continue
-
-            # Recursively process our dependencies.
-            children = self.sort_statement_forest(stmt.dep_stmts, seen)
-            ordered_code.extend(children)
-
-            # Append ourself.
-            ordered_code.append(stmt)
-            seen.add(stmt)
+            if expanded:
+                # All of our dependencies precede us.  Append ourself.
+                visiting.discard(stmt)
+                ordered_code.append(stmt)
+                seen.add(stmt)
+                continue
+            if stmt in visiting:
+                continue  # Break dependency cycles.
+            visiting.add(stmt)
+            stack.append((stmt, True))
+            stack.extend([(dep, False) for dep in reversed(stmt.dep_stmts)])
         return ordered_code
 
     def _write_license(self, stream):
@@ -1166,7 +1294,7 @@ class SvgToPythonScript(inkex.OutputExtension):
 
         # Remove keys with None values.  Write the license data, if any.
         info = {k: v for k, v in info.items() if v is not None}
-        if info == {}:
+        if not info:
             return
         stream.write("# Define the document's usage"
                      " license.\n".encode('utf-8'))
@@ -1223,7 +1351,7 @@ class SvgToPythonScript(inkex.OutputExtension):
                                                             self.rdf)]
 
         # Write all of the metadata we found.
-        if metadata == {}:
+        if not metadata:
             return
         stream.write('# Specify various document metadata.\n'.encode('utf-8'))
         try:
@@ -1312,11 +1440,10 @@ class SvgToPythonScript(inkex.OutputExtension):
         code = self.convert_all_shapes()
         self.find_dependencies(code)
         code = self.sort_statement_forest(code)
-        for stmt in code:
-            if stmt.delete_if_unused and not stmt.need_var_name:
-                continue
-            ln = str(stmt) + '\n'
-            stream.write(ln.encode('utf-8'))
+        lines = ''.join([str(stmt) + '\n'
+                         for stmt in code
+                         if stmt.need_var_name or not stmt.delete_if_unused])
+        stream.write(lines.encode('utf-8'))
 
 
 def main():
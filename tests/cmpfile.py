@@ -0,0 +1,52 @@
+##################################################
+# Name the reference files of comparison tests   #
+#                                                #
+# Author: Scott Pakin <scott-ink@pakin.org>      #
+##################################################
+
+import functools
+import re
+
+
+# Characters that cannot appear in an output file name.  Each is
+# replaced by a single underscore.
+_SANITIZE_RE = re.compile(r"[^\w-]")
+_UNSAFE_ASCII = "".join([chr(c) for c in range(128)
+                         if _SANITIZE_RE.match(chr(c))])
+_SANITIZE_ASCII = str.maketrans(_UNSAFE_ASCII, "_" * len(_UNSAFE_ASCII))
+
+
+def _sanitize_arg(arg, tempdir, datadir):
+    """Return an argument with directories abbreviated and all characters
+    that cannot appear in a file name replaced"""
+    if tempdir is not None:
+        arg = arg.replace(tempdir, "TMP_DIR")
+    arg = arg.replace(datadir, "DAT_DIR")
+    if arg.isascii():
+        return arg.translate(_SANITIZE_ASCII)
+    return _SANITIZE_RE.sub("_", arg)
+
+
+@functools.lru_cache(maxsize=256)
+def compute_cmpfile_name(prefix, args, addout, tempdir, datadir):
+    """Return the name of the output file for the arguments given"""
+    import hashlib  # Needed only by comparison tests.
+    if addout is not None:
+        args = list(args) + [str(addout)]
+    if len(args) > 1 or (args and args[0]):
+        # Modification from ComparisonMixin: always hash.  Hash the
+        # sanitized arguments one at a time, separated by "__", rather
+        # than joining them into a single string first.  The temporary
+        # directory cannot appear in the Python code that follows
+        # --program, so don't search it for one.
+        hasher = hashlib.blake2b(digest_size=16)
+        prev = None
+        for i, arg in enumerate(args):
+            if i > 0:
+                hasher.update(b"__")
+            arg_tempdir = None if prev == "--program" else tempdir
+            hasher.update(_sanitize_arg(arg, arg_tempdir, datadir)
+                          .encode("latin1"))
+            prev = arg
+        return f"{prefix}__{hasher.hexdigest()}.out"
+    return f"{prefix}.out"
@@ -7,29 +7,88 @@ from simpinkscr.simple_inkscape_scripting import SimpleInkscapeScripting
 from inkex.tester import ComparisonMixin, InkscapeExtensionTestMixin, TestCase
 from inkex.tester.filters import CompareOrderIndependentStyle
 from unittest.mock import patch
-from io import StringIO
-import hashlib
-import re
+from io import BytesIO, StringIO
+from .cmpfile import compute_cmpfile_name
+import os
+import urllib.request
+try:
+    from inkex.tester import ComparisonMeta
+except ImportError:
+    ComparisonMeta = None  # inkex < 1.4
+
+
+# Output filters shared by all comparison tests.
+_ORDER_INDEPENDENT = (CompareOrderIndependentStyle(),)
+
+# Minimal document fed to tests that read from standard input.
+EMPTY_SVG = "<svg />"
+
+# Remote image that tests load from a local copy in data/images.
+LOGO_URL = "https://media.inkscape.org/static/images/inkscape-logo.png"
+
+
+def _make_comparison_test(args):
+    """Return a test method that performs a single comparison"""
+    def test_comparison(self):
+        compare_files = self.compare_file
+        if not isinstance(compare_files, (list, tuple)):
+            self.assertCompare(compare_files,
+                               self.get_compare_cmpfile(args), args)
+            return
+        for compare_file in compare_files:
+            addout = os.path.basename(compare_file)
+            self.assertCompare(compare_file,
+                               self.get_compare_cmpfile(args, addout), args)
+    return test_comparison
 
 
 class CustomComparisonMixin(ComparisonMixin):
+    comparisons = []  # Don't inherit ComparisonMixin's default comparisons.
+    _compare_paths = {}  # Map from (args, addout) to an output file
+
+    def __init_subclass__(cls, **kwargs):
+        """Before inkex 1.4, replace test_all_comparisons with one test
+        method per comparison so that comparisons can be run (and fail)
+        independently.  inkex 1.4's ComparisonMeta already does this."""
+        super().__init_subclass__(**kwargs)
+        comparisons = cls.__dict__.get("comparisons")
+        if ComparisonMeta is not None or comparisons is None:
+            return
+        cls.test_all_comparisons = None
+        for i, args in enumerate(comparisons):
+            setattr(cls, "test_comparison_%02d" % i,
+                    _make_comparison_test(args))
+
+    @classmethod
+    def setUpClass(cls):
+        """Precompute the output file of every comparison.  Per-test
+        temporary directories do not exist yet, but they also cannot
+        appear in the comparisons, which are fixed at class definition."""
+        super().setUpClass()
+        compare_files = cls.compare_file
+        if isinstance(compare_files, (list, tuple)):
+            addouts = [os.path.basename(f) for f in compare_files]
+        else:
+            addouts = [None]
+        datadir = cls._datadir = cls.datadir()
+        cls._compare_paths = {}
+        for args in cls.comparisons:
+            args = tuple(args)
+            for addout in addouts:
+                name = compute_cmpfile_name("sis", args, addout, None, datadir)
+                cls._compare_paths[args, addout] = \
+                    cls.data_file("refs", name, check_exists=False)
+
     def get_compare_cmpfile(self, args, addout=None):
         """Generate an output file for the arguments given"""
-        if addout is not None:
-            args = list(args) + [str(addout)]
-        opstr = (
-            "__".join(args)
-            .replace(self.tempdir, "TMP_DIR")
-            .replace(self.datadir(), "DAT_DIR")
-        )
-        opstr = re.sub(r"[^\w-]", "__", opstr)
-        if opstr:
-            # Modification from ComparisonMixin: always hash.
-            opstr = hashlib.md5(opstr.encode("latin1")).hexdigest()
-            opstr = "__" + opstr
-        return self.data_file(
-            "refs", f"sis{opstr}.out", check_exists=False
-        )
+        args = tuple(args)
+        try:
+            return self._compare_paths[args, addout]
+        except KeyError:
+            pass
+        name = compute_cmpfile_name("sis", args, addout,
+                                    self.tempdir, self._datadir)
+        return self.data_file("refs", name, check_exists=False)
 
 
 class SimpInkScrTestShapeConst(CustomComparisonMixin,
@@ -38,49 +97,68 @@ class SimpInkScrTestShapeConst(CustomComparisonMixin,
     'Test examples from the Shape Construction wiki page.'
     # Indicate how testing should be performed.
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
 
     # Define a sequence of tests.
     comparisons = [
-        ('--program=circle((canvas.width/2, canvas.height/2), 50)',),
-        ('--program=ellipse((canvas.width/2, canvas.height/2), (75, 50))',),
-        ('--program=rect((canvas.width/2 - 50, canvas.height/2 - 30),'
-         ' (canvas.width/2 + 50, canvas.height/2 + 30))',),
-        ('--program=line((canvas.width, 0), (0, canvas.height))',),
-        ('--program=polyline([(0, 300), (150, 0), (300, 300), (150, 200)])',),
-        ('--program=polygon([(0, 300), (150, 0), (300, 300), (150, 200)])',),
-        ('--program=regular_polygon(5, (100, 100), 80)',),
-        ('--program=star(5, (100, 100), (80, 30))',),
-        ("--program=arc((canvas.width/2, canvas.height/2), 100,"
-         " (pi/5, 9*pi/5), 'slice', fill='yellow', stroke_width=2)",),
-        ("--program=path(['M', 226, 34, 'V', 237, 'L', 32, 185,"
-         " 'C', 32, 185, 45, -9, 226, 34, 'Z'])",),
-        ('''--program=
+        ('--program', 'circle((canvas.width/2, canvas.height/2), 50)'),
+        ('--program', 'ellipse((canvas.width/2, canvas.height/2), (75, 50))'),
+        ('--program', 'rect((canvas.width/2 - 50, canvas.height/2 - 30),'
+         ' (canvas.width/2 + 50, canvas.height/2 + 30))'),
+        ('--program', 'line((canvas.width, 0), (0, canvas.height))'),
+        ('--program',
+         'polyline([(0, 300), (150, 0), (300, 300), (150, 200)])'),
+        ('--program',
+         'polygon([(0, 300), (150, 0), (300, 300), (150, 200)])'),
+        ('--program', 'regular_polygon(5, (100, 100), 80)'),
+        ('--program', 'star(5, (100, 100), (80, 30))'),
+        ('--program', "arc((canvas.width/2, canvas.height/2), 100,"
+         " (pi/5, 9*pi/5), 'slice', fill='yellow', stroke_width=2)"),
+        ('--program', "path(['M', 226, 34, 'V', 237, 'L', 32, 185,"
+         " 'C', 32, 185, 45, -9, 226, 34, 'Z'])"),
+        ('--program', '''
 path([Move(226, 34),
       Vert(237),
       Line(32, 185),
       Curve(32, 185, 45, -9, 226, 34),
       ZoneClose()])
-''',),
-        ('''--program=
+'''),
+        ('--program', '''
 r = rect((50, 50), (100, 100))
 c = circle((200, 200), 25)
 connector(r, c, ctype='orthogonal', curve=15)
-''',),
-        ("--program=text('Simple Inkscape Scripting', (0, canvas.height),"
-         " font_size='36pt')",),
-        ('''--program=
+'''),
+        ('--program', "text('Simple Inkscape Scripting', (0, canvas.height),"
+         " font_size='36pt')"),
+        ('--program', '''
 t = text('Hello, ', (canvas.width/2, canvas.height/2), font_size='24pt',
          text_anchor='middle')
 t.add_text('Inkscape', font_weight='bold', fill='#800000')
 t.add_text('!!!')
-''',),
-        ("--program="
-         "image('https://media.inkscape.org/static/images/inkscape-logo.png',"
-         " (0, 0), embed=False)",)
+'''),
+        ('--program', f"image('{LOGO_URL}', (0, 0), embed=False)")
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(cls.data_file('images', 'inkscape-logo.png'), 'rb') as r:
+            cls._logo = r.read()
+
+    def setUp(self):
+        """Serve LOGO_URL from the local copy instead of the network"""
+        super().setUp()
+        real_urlopen = urllib.request.urlopen
+
+        def urlopen(url, *args, **kwargs):
+            if url == LOGO_URL:
+                return BytesIO(self._logo)
+            return real_urlopen(url, *args, **kwargs)
+        patcher = patch('urllib.request.urlopen', side_effect=urlopen)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
 
 class SimpInkScrTestPathOps(CustomComparisonMixin,
                             InkscapeExtensionTestMixin,
@@ -88,21 +166,21 @@ class SimpInkScrTestPathOps(CustomComparisonMixin,
     'Test examples from the Path Operations wiki page.'
     # Indicate how testing should be performed.
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
 
     # Define a sequence of tests.
     comparisons = [
-        ('''--program=
+        ('--program', '''
 c1 = circle((50, 50), 50, fill='#005500', fill_rule='evenodd').to_path()
 c2 = circle((100, 50), 50).to_path()
 c1.append(c2)
-''',),
-        ('''--program=
+'''),
+        ('--program', '''
 box = rect((0, 0), (200, 100), fill='#d4aa00').to_path()
 hole1 = rect((25, 25), (75, 75)).to_path()
 hole2 = rect((125, 25), (175, 75)).to_path()
 box.append([hole1.reverse(), hole2.reverse()])
-''',)
+''')
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
@@ -113,11 +191,11 @@ class SimpInkScrTestCommonArgs(CustomComparisonMixin,
     'Test examples from the Common Arguments wiki page.'
     # Indicate how testing should be performed.
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
 
     # Define a sequence of tests.
     comparisons = [
-        ('''--program=
+        ('--program', '''
 tr = inkex.Transform()
 tr.add_translate(30*pt, -12*pt)
 tr.add_rotate(-15, canvas.width/2, canvas.height/2)
@@ -129,21 +207,21 @@ text('Transform', (canvas.width/2, canvas.height/2),
      text_align='center',
      text_anchor='middle',
      fill='#003380')
-''',),
-        ('''--program=
+'''),
+        ('--program', '''
 r1 = rect((100, 0), (150, 50), fill='#fff6d5')
 r2 = rect((200, 400), (250, 450), fill='#fff6d5')
 connector(r1, r2, ctype='orthogonal', curve=100)
 circle((225, 225), 25, fill='red', conn_avoid=True)
-''',),
-        ('''--program=
+'''),
+        ('--program', '''
 polyline([(64,128), (320,64), (384,128), (640, 64)],
          stroke='#005544',
          stroke_width=32,
          stroke_linecap='round',
          stroke_linejoin='round',
          stroke_dasharray=[32, 32, 64, 32])
-''',)
+''')
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
@@ -154,11 +232,11 @@ class SimpInkScrTestCollections(CustomComparisonMixin,
     'Test examples from the Object Collections wiki page.'
     # Indicate how testing should be performed.
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
 
     # Define a sequence of tests.
     comparisons = [
-        ('''--program=
+        ('--program', '''
 colors = ['red', 'orange', 'yellow', 'green', 'blue']
 diag = []
 for j in range(5):
@@ -174,7 +252,7 @@ for c in diag:
     c.get_parent().ungroup(c)
     diag_gr.append(c)
 diag_gr.translate((120, 0))
-''',)
+''')
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
@@ -185,18 +263,18 @@ class SimpInkScrTestEffects(CustomComparisonMixin,
     'Test examples from the Effects wiki page.'
     # Indicate how testing should be performed.
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
 
     # Define a sequence of tests.
     comparisons = [
-        ('''--program=
+        ('--program', '''
 grad = linear_gradient((0, 0), (0, 1))
 for i in range(5):
     r, g, b = randint(0, 255), randint(0, 255), randint(0, 255)
     grad.add_stop(i/4.0, '#%02X%02X%02X' % (r, g, b))
 ellipse((200, 150), (200, 150), fill=grad)
-''',),
-        ('''--program=
+'''),
+        ('--program', '''
 arrowhead = path([Move(0, 0),
                   Line(4, 2),
                   Line(0, 4),
@@ -212,14 +290,14 @@ line((20, 20), (120, 20), stroke='orange', stroke_width=4,
 blue_arrowhead = marker(arrowhead, (1, 2), fill='blue')
 line((120, 40), (20, 40), stroke='blue', stroke_width=4,
      stroke_linecap='round', marker_end=blue_arrowhead)
-''',),
-        ('''--program=
+'''),
+        ('--program', '''
 blur = filter_effect('Make Blurry')
 blur.add('GaussianBlur', stdDeviation=10, edgeMode='duplicate')
 circle((canvas.width/2, canvas.height/2), 100, fill='yellow', stroke='black',
        stroke_width=5, filter=blur)
-''',),
-        ('''--program=
+'''),
+        ('--program', '''
 roughen = path_effect('rough_hatches',
                       do_bend=False,
                       fat_output=False,
@@ -227,21 +305,19 @@ roughen = path_effect('rough_hatches',
 e = ellipse((150, 100), (150, 100), stroke='#7f2aff', stroke_width=2)
 p = e.to_path()
 p.apply_path_effect(roughen)
-''',)
+''')
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
 
-class SimpInkScrTestAnimation(CustomComparisonMixin,
-                              InkscapeExtensionTestMixin,
-                              TestCase):
-    'Test examples from the Animation wiki page.'
-    # Indicate how testing should be performed.
-    effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+def _with_prologue(prologue, suffixes):
+    """Return a comparison for each suffix, run after a common prologue"""
+    return [('--program', '%s\n%s' % (prologue, suffix))
+            for suffix in suffixes]
+
 
-    # Define a helper string.
-    animation_base = '''\
+# Define a helper string shared by SimpInkScrTestAnimation tests.
+ANIMATION_BASE = '''\
 def make_rect(center, fill, edge=100):
     return rect(inkex.Vector2d(-edge/2, -edge/2) + center,
                 inkex.Vector2d(edge/2, edge/2) + center,
@@ -252,11 +328,21 @@ r2 = make_rect((canvas.width/2, canvas.height/2), '#9955ff')
 r3 = make_rect((canvas.width - 50, canvas.height - 50), '#d35f5f')
 '''
 
+
+class SimpInkScrTestAnimation(CustomComparisonMixin,
+                              InkscapeExtensionTestMixin,
+                              TestCase):
+    'Test examples from the Animation wiki page.'
+    # Indicate how testing should be performed.
+    effect_class = SimpleInkscapeScripting
+    compare_filters = _ORDER_INDEPENDENT
+
     # Define a sequence of tests.
     comparisons = [
-        ("--program=%s\nr1.animate([r2, r3], duration='3s',"
-         " key_times=[0, 0.75, 1])" % animation_base,),
-        ('''--program=
+        *_with_prologue(ANIMATION_BASE, [
+            "r1.animate([r2, r3], duration='3s', key_times=[0, 0.75, 1])"
+        ]),
+        ('--program', '''
 def make_rect(center, fill, edge=100):
     return rect(inkex.Vector2d(-edge/2, -edge/2) + center,
                 inkex.Vector2d(edge/2, edge/2) + center,
@@ -267,25 +353,17 @@ r4 = make_rect((0, 0), '#5599ff')
 r4.transform = 'translate(%.5f, %.5f) rotate(200) scale(2)' % \
                (canvas.width/2, canvas.height/2)
 r1.animate(r4, duration='3s')
-''',)
+''')
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
 
-class SimpInkScrTestModExObjs(CustomComparisonMixin,
-                              InkscapeExtensionTestMixin,
-                              TestCase):
-    'Test examples from the Modifying Existing Objects wiki page.'
-    # Indicate how testing should be performed.
-    effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
-
-    # Define a few helper strings.
-    blue_red = '''
+# Define a few helper strings shared by SimpInkScrTestModExObjs tests.
+BLUE_RED = '''
 blue = rect((90, 0), (170, 50), fill='#55ddff')
 red = rect((0, 0), (80, 50), fill='#ff5555')
 '''
-    s_path = '''
+S_PATH = '''
 S = path([Move(57, 13),
           Vert(28),
           Quadratic(52, 25, 46, 24),
@@ -318,7 +396,7 @@ S = path([Move(57, 13),
           ZoneClose()],
          fill='#decd87', stroke_width=5)
 '''
-    z_order = '''
+Z_ORDER = '''
 boxes = []
 ul = inkex.Vector2d()
 for c in ['beige', 'maroon', 'mediumslateblue', 'mediumseagreen', 'tan']:
@@ -326,38 +404,50 @@ for c in ['beige', 'maroon', 'mediumslateblue', 'mediumseagreen', 'tan']:
     ul += (10, 10)
 '''
 
+
+class SimpInkScrTestModExObjs(CustomComparisonMixin,
+                              InkscapeExtensionTestMixin,
+                              TestCase):
+    'Test examples from the Modifying Existing Objects wiki page.'
+    # Indicate how testing should be performed.
+    effect_class = SimpleInkscapeScripting
+    compare_filters = _ORDER_INDEPENDENT
+
     # Define a sequence of tests.
     comparisons = [
-        ('--program=%s\nred.translate((50, 30))' % blue_red,),
-        ('--program=%s\nred.rotate(30)' % blue_red,),
-        ('--program=%s\nred.rotate(30, (85, 25))' % blue_red,),
-        ("--program=%s\nred.rotate(30, 'll')" % blue_red,),
-        ('--program=%s\nred.scale(1.5)' % blue_red,),
-        ('--program=%s\nred.scale((0.75, 1.5))' % blue_red,),
-        ("--program=%s\nred.scale(1.5, 'ur')" % blue_red,),
-        ('--program=%s\nred.skew((10, 0))' % blue_red,),
-        ("--program=%s\nred.skew((0, 10), 'lr')" % blue_red,),
-        ("--program=%s\nred.scale(1.5, 'ul').rotate(14, 'ul')" % blue_red,),
-        ("--program=%s\nS.translate_path((100, 100))" % s_path,),
-        ("--program=%s\nS.rotate_path(-25)" % s_path,),
-        ("--program=%s\nS.scale_path((0.75, 1.5), 'ul')" % s_path,),
-        ("--program=%s\nS.skew_path((0, 30), 'ul')" % s_path,),
-        ('''--program=
+        *_with_prologue(BLUE_RED, [
+            'red.translate((50, 30))',
+            'red.rotate(30)',
+            'red.rotate(30, (85, 25))',
+            "red.rotate(30, 'll')",
+            'red.scale(1.5)',
+            'red.scale((0.75, 1.5))',
+            "red.scale(1.5, 'ur')",
+            'red.skew((10, 0))',
+            "red.skew((0, 10), 'lr')",
+            "red.scale(1.5, 'ul').rotate(14, 'ul')"]),
+        *_with_prologue(S_PATH, [
+            'S.translate_path((100, 100))',
+            'S.rotate_path(-25)',
+            "S.scale_path((0.75, 1.5), 'ul')",
+            "S.skew_path((0, 30), 'ul')"]),
+        ('--program', '''
 c = circle((75, 75), 38, fill='darkturquoise', stroke_width=2)
 rect((0, 0), (75, 75), fill='aquamarine', stroke_width=2)
 c.remove()
 c.unremove()
-''',),
-        ("--program=%s\nboxes[0].z_order('top')" % z_order,),
-        ("--program=%s\nboxes[-1].z_order('bottom')" % z_order,),
-        ("--program=%s\nboxes[2].z_order('raise')" % z_order,),
-        ("--program=%s\nboxes[3].z_order('lower', 2)" % z_order,),
-        ("--program=%s\nboxes[1].z_order('to', 3)" % z_order,),
-        (f'''--program=
-{z_order}
+'''),
+        *_with_prologue(Z_ORDER, [
+            "boxes[0].z_order('top')",
+            "boxes[-1].z_order('bottom')",
+            "boxes[2].z_order('raise')",
+            "boxes[3].z_order('lower', 2)",
+            "boxes[1].z_order('to', 3)"]),
+        ('--program', f'''
+{Z_ORDER}
 for obj in z_sort(boxes):
     obj.z_order('bottom')
-''',)
+''')
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
@@ -368,21 +458,21 @@ class SimpInkScrTestOtherFeatures(CustomComparisonMixin,
     'Test examples from the Other Features wiki page.'
     # Indicate how testing should be performed.
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
 
     # Define a sequence of tests.
     comparisons = [
-        ('''--program=
+        ('--program', '''
 house = rect((32, 64), (96, 112), fill='#ff0000', stroke_width=2)
 roof = polygon([(16, 64), (64, 16), (112, 64)], fill='#008000', stroke_width=2)
 hyperlink([house, roof], 'https://www.pakin.org/', title='My home page')
-''',),
-        ('''--program=
+'''),
+        ('--program', '''
 g1 = guide((0, 0), 10)
 g2 = guide((canvas.width, canvas.height), 10, color='#00ff00')
 guides.extend([g1, g2])
-''',),
-        ('''--program=
+'''),
+        ('--program', '''
 r = rect((100, 100), (200, 200), stroke_width=16, stroke='#000080', fill='#add8e6')
 new_objs = apply_action('object-stroke-to-path', r)
 for obj in new_objs:
@@ -391,7 +481,7 @@ for obj in new_objs:
             obj.translate_path((50, 50))
     except KeyError:
         pass
-''',)
+''')
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
@@ -402,17 +492,17 @@ class SimpInkScrTestDocLayout(CustomComparisonMixin,
     'Test examples from the Document Layout wiki page.'
     # Indicate how testing should be performed.
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
 
     # Define a sequence of tests.
     comparisons = [
-        ('''--program=
+        ('--program', '''
 r1 = rect((100, 100), (200, 200), fill='firebrick', stroke_width='6pt')
 r2 = rect((300, 150), (400, 250), fill='gold', stroke_width='6pt')
 r3 = rect((200, 300), (300, 400), fill='royalblue', stroke_width='6pt')
 canvas.resize_to_content([r1, r2, r3])
-''',),
-        ('''--program=
+'''),
+        ('--program', '''
 import string
 push_defaults()
 canvas.resize_by_name('A6')
@@ -425,7 +515,7 @@ for y in range(2):
         bbox = pg.bounding_box()
         text(string.ascii_uppercase[i], (bbox.center_x, bbox.center_y + 72*pt))
 pop_defaults()
-''',)
+''')
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
@@ -436,11 +526,11 @@ class SimpInkScrTestAdvanced(CustomComparisonMixin,
     'Test examples from the Advanced Usage wiki page.'
     # Indicate how testing should be performed.
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
 
     # Define a sequence of tests.
     comparisons = [
-        ("""--program=
+        ('--program', """
 rect((10, 10), (390, 210), round=25, fill='#e7e8e3', stroke_width='2px')
 foreign((20, 20), (380, 200), '''\
 <div xmlns="http://www.w3.org/1999/xhtml">
@@ -455,7 +545,7 @@ foreign((20, 20), (380, 200), '''\
   </table>
 </div>
 ''')
-""",)
+""")
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
@@ -466,11 +556,11 @@ class SimpInkScrTestMetadata(CustomComparisonMixin,
     'Test examples from the Metadata wiki page.'
     # Indicate how testing should be performed.
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
 
     # Define a sequence of tests.
     comparisons = [
-        ("""--program=
+        ('--program', """
 import datetime
 
 now = datetime.datetime.now()
@@ -494,7 +584,7 @@ metadata.description = 'Painting of a tobacco pipe on a solid' \\
     ' "Ce n\\'est pas non plus un tuyau" handwritten beneath it'
 metadata.contributors = 'Fred Nerk'
 metadata.license = 'CC Attribution-ShareAlike'
-""",)
+""")
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
@@ -505,11 +595,11 @@ class SimpInkScrTestAdditional(CustomComparisonMixin,
     'Test additional snippets of code to increase coverage.'
     # Indicate how testing should be performed.
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
 
     # Define a sequence of tests.
     comparisons = [
-        ('''--program=
+        ('--program', '''
 p = path(['M', 150, 50,
           'C', 100, 50, 50, 100, 50, 192,
           'V', 300,
@@ -519,7 +609,7 @@ p = path(['M', 150, 50,
           'Z'],
          fill='#0055d4', stroke_width=3)
 p.to_path(all_curves=True)
-''',)
+''')
     ]
     compare_file = 'svg/default-inkscape-SVG.svg'
 
@@ -528,13 +618,13 @@ class SimpInkScrModifyTest(CustomComparisonMixin,
                            InkscapeExtensionTestMixin,
                            TestCase):
     effect_class = SimpleInkscapeScripting
-    compare_filters = [CompareOrderIndependentStyle()]
+    compare_filters = _ORDER_INDEPENDENT
     compare_file = 'svg/shapes.svg'
     comparisons = [
-        ('''--program=
+        ('--program', '''
 for obj in all_shapes():
     obj.rotate(15, 'center', first=True)
-''',)
+''')
     ]
 
 
@@ -574,7 +664,7 @@ class SimpInkScrRestArgsTest(TestCase):
         args = ["--program", "print(user_args)"]
         effect = self.effect_class()
 
-        with patch('sys.stdin', StringIO("<svg />")):
+        with patch('sys.stdin', StringIO(EMPTY_SVG)):
             effect.run(args)
             output = _stderr.getvalue().rstrip()
         assert "[]" == output
@@ -584,7 +674,7 @@ class SimpInkScrRestArgsTest(TestCase):
         args = ["--program", "print(user_args)", "-"]
         effect = self.effect_class()
 
-        with patch('sys.stdin', StringIO("<svg />")):
+        with patch('sys.stdin', StringIO(EMPTY_SVG)):
             effect.run(args)
             output = _stderr.getvalue().rstrip()
         assert "[]" == output
@@ -604,7 +694,7 @@ class SimpInkScrRestArgsTest(TestCase):
                 "--", "-a", "1", "--b", "2", "3"]
         effect = self.effect_class()
 
-        with patch('sys.stdin', StringIO("<svg />")):
+        with patch('sys.stdin', StringIO(EMPTY_SVG)):
             effect.run(args)
             output = _stderr.getvalue().rstrip()
 
@@ -5,33 +5,81 @@
 # Author: Scott Pakin <scott-ink@pakin.org>      #
 ##################################################
 
-from simpinkscr.svg_to_simp_ink_script import SvgToPythonScript
+from simpinkscr.svg_to_simp_ink_script import SvgToPythonScript, \
+    _parse_nums, _svg_str_to_python
 from inkex.tester import ComparisonMixin, TestCase
-import hashlib
-import re
+from .cmpfile import compute_cmpfile_name
+import os
 
 
 class CustomComparisonMixin(ComparisonMixin):
+    comparisons = []  # Don't inherit ComparisonMixin's default comparisons.
+
+    @classmethod
+    def setUpClass(cls):
+        """Look up the data directory once for all tests in the class"""
+        super().setUpClass()
+        cls._datadir = cls.datadir()
+
     def get_compare_cmpfile(self, args, addout=None):
-        """Generate an output file for the arguments given"""
-        if addout is not None:
-            args = list(args) + [str(addout)]
-        opstr = (
-            "__".join(args)
-            .replace(self.tempdir, "TMP_DIR")
-            .replace(self.datadir(), "DAT_DIR")
-        )
-        opstr = re.sub(r"[^\w-]", "__", opstr)
-        if opstr:
-            # Modification from ComparisonMixin: always hash.
-            opstr = hashlib.md5(opstr.encode("latin1")).hexdigest()
-            opstr = "__" + opstr
-        return self.data_file(
-            "refs", f"sispy{opstr}.out", check_exists=False
-        )
+        """Generate an output file for the arguments and input file given.
+        Conversions take no arguments, so the input file name is always
+        part of the output file name."""
+        if addout is None:
+            addout = os.path.basename(self.compare_file)
+        name = compute_cmpfile_name("sispy", tuple(args), addout,
+                                    self.tempdir, self._datadir)
+        return self.data_file("refs", name, check_exists=False)
 
 
 class SimpInkScrOutputBasicTest(CustomComparisonMixin, TestCase):
     effect_class = SvgToPythonScript
     compare_file = 'svg/shapes.svg'
     comparisons = [()]
+
+
+class SimpInkScrOutputPolygonForeignTest(CustomComparisonMixin, TestCase):
+    effect_class = SvgToPythonScript
+    compare_file = 'svg/polygon-foreign.svg'
+    comparisons = [()]
+
+
+class SimpInkScrOutputUnusedDefsTest(CustomComparisonMixin, TestCase):
+    effect_class = SvgToPythonScript
+    compare_file = 'svg/unused-defs.svg'
+    comparisons = [()]
+
+
+class SimpInkScrIdToVarTest(TestCase):
+    def test_id2var_replaces_invalid_characters(self):
+        id2var = SvgToPythonScript.Statement.id2var
+        assert id2var('my-rect.1') == 'my_rect_1'
+
+    def test_id2var_with_leading_digit(self):
+        id2var = SvgToPythonScript.Statement.id2var
+        assert id2var('1abc') == '_1abc'
+
+    def test_id2var_keeps_ids_distinct(self):
+        id2var = SvgToPythonScript.Statement.id2var
+        assert id2var('1a') != id2var('2a')
+
+    def test_id2var_none(self):
+        assert SvgToPythonScript.Statement.id2var(None) is None
+
+
+class SimpInkScrSvgStrToPythonTest(TestCase):
+    def test_scalars(self):
+        assert _svg_str_to_python('3') == 3
+        assert _svg_str_to_python('2.5') == 2.5
+        assert _svg_str_to_python('1e5') == 1e5
+        assert _svg_str_to_python('false') is False
+        assert _svg_str_to_python('round') == "'round'"
+        assert _svg_str_to_python('') == "''"
+
+    def test_lists(self):
+        assert _svg_str_to_python('1,0;true') == [1, 0, True]
+
+
+class SimpInkScrParseNumsTest(TestCase):
+    def test_mixed_separators(self):
+        assert _parse_nums('0 -1.5,2e1 .5') == [0.0, -1.5, 20.0, 0.5]